@@ -1,22 +1,21 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, Response, stream_with_context
+from flask import Blueprint, Flask, current_app, render_template, request, jsonify, redirect, url_for, flash, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from jinja2 import FileSystemBytecodeCache
 from sqlalchemy import func
-import praw
+from sqlalchemy.orm import joinedload
+import click
 import os
 import json
 import time
 from datetime import datetime
 from dotenv import load_dotenv
+from events import broker
+from payload_cache import post_payloads
 
-# Load environment variables
-load_dotenv()
+db = SQLAlchemy()
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///reddit_sorter.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db = SQLAlchemy(app)
+# Routes and CLI commands are registered on the app by create_app()
+main = Blueprint('main', __name__, cli_group=None)
 
 # Database Models
 class Category(db.Model):
@@ -52,6 +51,14 @@ class RedditPost(db.Model):
 
 # Initialize Reddit API
 def get_reddit_instance():
+    # Tests and the load-test harness can plug in their own client
+    factory = current_app.config.get('REDDIT_CLIENT_FACTORY')
+    if factory:
+        return factory()
+
+    # PRAW is slow to import and only needed when syncing, so load it on first use
+    import praw
+
     return praw.Reddit(
         client_id=os.environ.get('REDDIT_CLIENT_ID'),
         client_secret=os.environ.get('REDDIT_CLIENT_SECRET'),
@@ -60,18 +67,83 @@ def get_reddit_instance():
         password=os.environ.get('REDDIT_PASSWORD')
     )
 
-@app.route('/')
+# Card layouts used by the pages that render post cards (see _post_card.html)
+POST_CARD_VARIANTS = {
+    'compact': {},
+    'detailed': {'excerpt_length': 300, 'show_saved_at': True},
+}
+
+def wants_json():
+    """True when the client asked for a JSON fragment instead of a full page"""
+    return request.accept_mimetypes.best_match(['text/html', 'application/json']) == 'application/json'
+
+def serialize_post(post):
+    return {
+        'id': post.id,
+        'title': post.title,
+        'author': post.author,
+        'subreddit': post.subreddit,
+        'url': post.url,
+        'score': post.score,
+        'num_comments': post.num_comments,
+        'created_utc': post.created_utc.isoformat() if post.created_utc else None,
+        'saved_at': post.saved_at.isoformat(),
+        'category_id': post.category_id,
+        'category_name': post.category.name if post.category else None,
+        'category_color': post.category.color if post.category else None,
+        'permalink': post.permalink,
+        'is_self': post.is_self,
+        'thumbnail': post.thumbnail,
+        'preview_url': post.preview_url
+    }
+
+def post_payload_key(post_id, reddit_id, category_id, category_version):
+    """Cache key for a post's encoded JSON
+
+    Posts are immutable after ingest apart from their category, so the key is
+    the post's identity, its category_id and the category's (name, color).
+    """
+    return (post_id, reddit_id, category_id, category_version)
+
+def category_version(category):
+    return (category.name, category.color) if category else None
+
+def cache_post_payload(post, payload=None):
+    """Encode a post (or an already serialized payload) and store it in the payload cache"""
+    encoded = json.dumps(payload or serialize_post(post), sort_keys=True, separators=(',', ':')).encode('utf-8')
+    post_payloads.put(post_payload_key(post.id, post.reddit_id, post.category_id, category_version(post.category)), encoded)
+    return encoded
+
+def serialize_category(category):
+    return {
+        'id': category.id,
+        'name': category.name,
+        'color': category.color
+    }
+
+def render_post_cards(post, categories):
+    """Render a post card in every layout so each open page can pick its own"""
+    return {variant: render_template('_post_card.html', post=post, categories=categories, **options)
+            for variant, options in POST_CARD_VARIANTS.items()}
+
+def category_error(message):
+    if wants_json():
+        return jsonify({'error': message}), 400
+    flash(message, 'error')
+    return redirect(url_for('main.categories'))
+
+@main.route('/')
 def index():
     categories = Category.query.all()
     posts = RedditPost.query.order_by(RedditPost.saved_at.desc()).limit(20).all()
     return render_template('index.html', categories=categories, posts=posts)
 
-@app.route('/fetch_saved_posts')
+@main.route('/fetch_saved_posts')
 def fetch_saved_posts():
     # Redirect to the live progress page
     return render_template('fetch_progress.html')
 
-@app.route('/fetch_saved_posts_stream')
+@main.route('/fetch_saved_posts_stream')
 def fetch_saved_posts_stream():
     def generate():
         try:
@@ -90,8 +162,11 @@ def fetch_saved_posts_stream():
             new_posts = 0
             skipped_posts = 0
             total_processed = 0
+            # Plain values: the per-post commits below would otherwise expire and reload each category
+            categories = [{'id': category.id, 'name': category.name, 'color': category.color}
+                          for category in Category.query.all()]
             
-            for submission in user.saved(limit=100):  # Fetch last 100 saved posts
+            for submission in user.saved(limit=current_app.config['SYNC_FETCH_LIMIT']):
                 total_processed += 1
                 
                 # Check if post already exists
@@ -117,6 +192,11 @@ def fetch_saved_posts_stream():
                         db.session.add(post)
                         db.session.commit()
                         new_posts += 1
+                        payload = serialize_post(post)
+                        cache_post_payload(post, payload)
+                        if broker.has_subscribers():
+                            broker.publish('post_added', post=payload,
+                                           html=render_post_cards(post, categories))
                         
                         yield f"data: {json.dumps({'type': 'post_added', 'message': f'Added: {submission.title[:60]}...', 'subreddit': submission.subreddit.display_name, 'new': new_posts, 'skipped': skipped_posts, 'total': total_processed})}\n\n"
                     except Exception as e:
@@ -127,7 +207,7 @@ def fetch_saved_posts_stream():
                     if skipped_posts % 10 == 0:  # Show progress every 10 skipped posts
                         yield f"data: {json.dumps({'type': 'post_skipped', 'message': f'Skipping already saved posts...', 'new': new_posts, 'skipped': skipped_posts, 'total': total_processed})}\n\n"
                 
-                time.sleep(0.1)  # Small delay to make progress visible
+                time.sleep(current_app.config['SYNC_PROGRESS_DELAY'])  # Small delay to make progress visible
             
             yield f"data: {json.dumps({'type': 'info', 'message': f'Processing complete! Processed {total_processed} posts.'})}\n\n"
             yield f"data: {json.dumps({'type': 'success', 'message': f'Successfully added {new_posts} new posts! ({skipped_posts} already existed)'})}\n\n"
@@ -139,47 +219,67 @@ def fetch_saved_posts_stream():
     
     return Response(stream_with_context(generate()), mimetype='text/event-stream')
 
-@app.route('/categories')
+@main.route('/events')
+def events():
+    # Long-lived stream of live updates for open pages (see events.py)
+    return Response(broker.stream(broker.subscribe()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
+@main.route('/categories')
 def categories():
     categories = Category.query.all()
     return render_template('categories.html', categories=categories)
 
-@app.route('/create_category', methods=['POST'])
+@main.route('/create_category', methods=['POST'])
 def create_category():
     name = request.form.get('name').strip()
     color = request.form.get('color', '#007bff')
     
     if not name:
-        flash('Category name is required!', 'error')
-        return redirect(url_for('categories'))
+        return category_error('Category name is required!')
     
     existing = Category.query.filter_by(name=name).first()
     if existing:
-        flash('Category with this name already exists!', 'error')
-        return redirect(url_for('categories'))
+        return category_error('Category with this name already exists!')
     
     category = Category(name=name, color=color)
     db.session.add(category)
     db.session.commit()
+    broker.publish('category_changed', action='created', category=serialize_category(category))
+    
+    if wants_json():
+        return jsonify({'category': serialize_category(category),
+                        'html': render_template('_category_card.html', category=category)}), 201
     
     flash(f'Category "{name}" created successfully!', 'success')
-    return redirect(url_for('categories'))
+    return redirect(url_for('main.categories'))
 
-@app.route('/update_category/<int:category_id>', methods=['POST'])
+@main.route('/update_category/<int:category_id>', methods=['POST'])
 def update_category(category_id):
     category = Category.query.get_or_404(category_id)
-    category.name = request.form.get('name').strip()
-    category.color = request.form.get('color', '#007bff')
+    name = request.form.get('name').strip()
+    color = request.form.get('color', '#007bff')
+    
+    if not name:
+        return category_error('Category name is required!')
     
-    if not category.name:
-        flash('Category name is required!', 'error')
-        return redirect(url_for('categories'))
+    existing = Category.query.filter(Category.name == name, Category.id != category_id).first()
+    if existing:
+        return category_error('Category with this name already exists!')
     
+    category.name = name
+    category.color = color
     db.session.commit()
+    broker.publish('category_changed', action='updated', category=serialize_category(category))
+    
+    if wants_json():
+        return jsonify({'category': serialize_category(category),
+                        'html': render_template('_category_card.html', category=category)})
+    
     flash(f'Category "{category.name}" updated successfully!', 'success')
-    return redirect(url_for('categories'))
+    return redirect(url_for('main.categories'))
 
-@app.route('/delete_category/<int:category_id>')
+@main.route('/delete_category/<int:category_id>')
 def delete_category(category_id):
     category = Category.query.get_or_404(category_id)
     
@@ -188,13 +288,18 @@ def delete_category(category_id):
     for post in posts_in_category:
         post.category_id = None
     
+    deleted = serialize_category(category)
     db.session.delete(category)
     db.session.commit()
+    broker.publish('category_changed', action='deleted', category=deleted)
+    
+    if wants_json():
+        return jsonify({'category': deleted})
     
     flash(f'Category "{category.name}" deleted successfully!', 'success')
-    return redirect(url_for('categories'))
+    return redirect(url_for('main.categories'))
 
-@app.route('/assign_category/<int:post_id>', methods=['POST'])
+@main.route('/assign_category/<int:post_id>', methods=['POST'])
 def assign_category(post_id):
     post = RedditPost.query.get_or_404(post_id)
     category_id = request.form.get('category_id')
@@ -205,16 +310,27 @@ def assign_category(post_id):
         if category:
             post.category_id = category_id
         else:
+            if wants_json():
+                return jsonify({'error': 'Invalid category selected!'}), 400
             flash('Invalid category selected!', 'error')
-            return redirect(url_for('index'))
+            return redirect(url_for('main.index'))
     else:
         post.category_id = None
     
     db.session.commit()
+    
+    # Only the category badge changes, so that is the only fragment sent back
+    payload = {'post': serialize_post(post), 'html': render_template('_category_badge.html', post=post)}
+    cache_post_payload(post, payload['post'])
+    broker.publish('post_updated', **payload)
+    
+    if wants_json():
+        return jsonify(payload)
+    
     flash('Post category updated successfully!', 'success')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/posts')
+@main.route('/posts')
 def posts():
     category_id = request.args.get('category_id', type=int)
     show_uncategorized = request.args.get('uncategorized', type=str)
@@ -238,7 +354,7 @@ def posts():
                          selected_category_id=category_id, search_term=search, 
                          show_uncategorized=show_uncategorized)
 
-@app.route('/api/posts')
+@main.route('/api/posts')
 def api_posts():
     category_id = request.args.get('category_id', type=int)
     search = request.args.get('search', '').strip()
@@ -251,35 +367,127 @@ def api_posts():
     if search:
         query = query.filter(RedditPost.title.contains(search))
     
-    posts = query.order_by(RedditPost.saved_at.desc()).all()
+    query = query.order_by(RedditPost.saved_at.desc())
     
-    return jsonify([{
-        'id': post.id,
-        'title': post.title,
-        'author': post.author,
-        'subreddit': post.subreddit,
-        'url': post.url,
-        'score': post.score,
-        'num_comments': post.num_comments,
-        'created_utc': post.created_utc.isoformat() if post.created_utc else None,
-        'saved_at': post.saved_at.isoformat(),
-        'category_id': post.category_id,
-        'category_name': post.category.name if post.category else None,
-        'category_color': post.category.color if post.category else None,
-        'permalink': post.permalink,
-        'is_self': post.is_self,
-        'thumbnail': post.thumbnail,
-        'preview_url': post.preview_url
-    } for post in posts])
+    # Only fetch the columns that make up the cache key; full rows are loaded for misses
+    rows = query.with_entities(RedditPost.id, RedditPost.reddit_id, RedditPost.category_id).all()
+    
+    # A listing larger than the LRU would evict every entry before the next request
+    # reads it back, so encode it directly instead of churning the cache
+    if len(rows) > post_payloads.maxsize:
+        posts = query.options(joinedload(RedditPost.category)).all()
+        return jsonify([serialize_post(post) for post in posts])
+    
+    category_versions = {row.id: (row.name, row.color)
+                         for row in db.session.query(Category.id, Category.name, Category.color)}
+    
+    payloads = [post_payloads.get(post_payload_key(row.id, row.reddit_id, row.category_id,
+                                                   category_versions.get(row.category_id)))
+                for row in rows]
+    
+    missing = [row.id for row, payload in zip(rows, payloads) if payload is None]
+    if missing:
+        encoded = {}
+        # Chunked to stay under SQLite's bound-parameter limit
+        for start in range(0, len(missing), 500):
+            chunk = RedditPost.query.options(joinedload(RedditPost.category)).filter(
+                RedditPost.id.in_(missing[start:start + 500]))
+            for post in chunk:
+                encoded[post.id] = cache_post_payload(post)
+        # A post deleted between the two queries is left out rather than failing the request
+        payloads = [payload or encoded.get(row.id) for row, payload in zip(rows, payloads)]
+        payloads = [payload for payload in payloads if payload]
+    
+    return Response(b'[' + b','.join(payloads) + b']', mimetype='application/json')
+
+def init_db():
+    """Create any missing tables and the default "Uncategorized" category"""
+    db.create_all()
+    if not Category.query.filter_by(name='Uncategorized').first():
+        db.session.add(Category(name='Uncategorized', color='#6c757d'))
+        db.session.commit()
+
+@main.cli.command('init-db')
+def init_db_command():
+    """Create the database tables and default category (safe to re-run)"""
+    init_db()
+    click.echo(f"Initialized the database at {db.engine.url.render_as_string(hide_password=True)}")
+
+@main.cli.command('export-archive')
+@click.argument('path')
+def export_archive_command(path):
+    """Export categories and posts to a compressed NDJSON archive (.zst or .gz)"""
+    from archive import ArchiveError, export_archive
+
+    db.create_all()
+    try:
+        counts = export_archive(path)
+    except ArchiveError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Exported {counts['categories']} categories and {counts['posts']} posts to {path}")
+
+@main.cli.command('import-archive')
+@click.argument('path')
+def import_archive_command(path):
+    """Import categories and posts from an archive created by export-archive"""
+    from archive import ArchiveError, import_archive
+
+    db.create_all()
+    try:
+        counts = import_archive(path)
+    except ArchiveError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Imported {counts['categories']} new categories and {counts['posts']} new posts from {path}")
+
+@main.cli.command('compile-templates')
+def compile_templates_command():
+    """Compile every template into the on-disk bytecode cache"""
+    templates = current_app.jinja_env.list_templates(extensions=['html'])
+    for name in templates:
+        current_app.jinja_env.get_template(name)
+    click.echo(f"Compiled {len(templates)} templates into {current_app.config['TEMPLATE_CACHE_DIR']}")
+
+class LazyBytecodeCache(FileSystemBytecodeCache):
+    """Bytecode cache that only creates its directory once a template is compiled"""
+
+    def dump_bytecode(self, bucket):
+        os.makedirs(self.directory, exist_ok=True)
+        super().dump_bytecode(bucket)
+
+def create_app(config=None):
+    """Application factory
+
+    ``config`` overrides the defaults, which come from the environment (and
+    ``.env``). Set ``TEMPLATE_CACHE_DIR`` to ``None`` to disable the Jinja
+    bytecode cache.
+    """
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///reddit_sorter.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['TEMPLATE_CACHE_DIR'] = os.path.join(app.instance_path, 'template_cache')
+    app.config['SYNC_FETCH_LIMIT'] = 100  # Saved posts fetched per sync
+    app.config['SYNC_PROGRESS_DELAY'] = 0.1  # Seconds between posts so progress is visible
+    app.config['REDDIT_CLIENT_FACTORY'] = None  # Callable returning a praw.Reddit-like client
+    if config:
+        app.config.update(config)
+
+    # Reuse compiled templates across processes instead of recompiling on every start
+    if app.config['TEMPLATE_CACHE_DIR']:
+        app.jinja_options = {**app.jinja_options,
+                             'bytecode_cache': LazyBytecodeCache(app.config['TEMPLATE_CACHE_DIR'])}
+
+    db.init_app(app)
+    app.register_blueprint(main)
+
+    return app
 
 if __name__ == '__main__':
+    app = create_app()
+
     with app.app_context():
-        db.create_all()
-        
-        # Create default "Uncategorized" category if it doesn't exist
-        if not Category.query.filter_by(name='Uncategorized').first():
-            uncategorized = Category(name='Uncategorized', color='#6c757d')
-            db.session.add(uncategorized)
-            db.session.commit()
+        init_db()
     
     app.run(debug=True)
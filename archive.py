@@ -0,0 +1,240 @@
+"""
+Archive export/import for Reddit Post Sorter
+
+An archive is a newline-delimited JSON (NDJSON) snapshot of the database,
+compressed with zstd (``.zst``) or gzip (``.gz``) depending on the file
+extension. The first line is a header, followed by one ``category`` record
+per category and one ``post`` record per saved post. Category assignments
+travel with each post as ``category_id`` and are remapped by category name on
+import, so an archive can be restored into an empty database or merged into
+an existing one.
+"""
+import gzip
+import io
+import json
+import queue
+import threading
+from datetime import datetime
+
+from sqlalchemy import insert, select
+
+from app import db, Category, RedditPost
+
+ARCHIVE_FORMAT = 'reddit-sorter-archive'
+ARCHIVE_VERSION = 1
+
+# Rows per bulk-insert transaction on import / per fetch batch on export
+CHUNK_SIZE = 5000
+
+# Number of parsed chunks the reader thread may buffer ahead of the writer
+READ_AHEAD_CHUNKS = 4
+
+DATETIME_FIELDS = {
+    'category': ('created_at',),
+    'post': ('created_utc', 'saved_at'),
+}
+
+# Fields the importer relies on for each record type
+REQUIRED_FIELDS = {
+    'category': ('id', 'name'),
+    'post': ('reddit_id',),
+}
+
+
+class ArchiveError(Exception):
+    """Raised when an archive file is missing, malformed or unsupported"""
+
+
+def open_archive(path, mode='r'):
+    """Open an archive file as a text stream, compressing by file extension"""
+    if mode not in ('r', 'w'):
+        raise ValueError(f'Unsupported mode: {mode}')
+
+    try:
+        return _open_stream(path, mode)
+    except OSError as e:
+        raise ArchiveError(f'Cannot open {path}: {e.strerror or e}') from e
+
+
+def _open_stream(path, mode):
+    if path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            raise ArchiveError('zstd archives require the "zstandard" package')
+
+        if mode == 'w':
+            raw = open(path, 'wb')
+            stream = zstandard.ZstdCompressor(level=10, threads=-1).stream_writer(raw, closefd=True)
+        else:
+            raw = open(path, 'rb')
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding='utf-8')
+
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+
+    return open(path, mode, encoding='utf-8')
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+_encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=_default)
+
+
+def _decode(line):
+    """Parse one record line, raising ValueError if it cannot be imported"""
+    record = json.loads(line)
+    if not isinstance(record, dict) or record.get('type') not in REQUIRED_FIELDS:
+        raise ValueError('expected a category or post record')
+    missing = [field for field in REQUIRED_FIELDS[record['type']] if record.get(field) is None]
+    if missing:
+        raise ValueError(f'{record["type"]} record is missing {", ".join(missing)}')
+    for field in DATETIME_FIELDS[record['type']]:
+        if record.get(field):
+            try:
+                record[field] = datetime.fromisoformat(record[field])
+            except TypeError:
+                raise ValueError(f'{field} is not an ISO 8601 string') from None
+    return record
+
+
+def export_archive(path, chunk_size=CHUNK_SIZE):
+    """Stream every category and post into an archive at ``path``
+
+    Rows are fetched in batches of ``chunk_size`` and written as they arrive,
+    so memory use stays flat regardless of how many posts are stored.
+    Returns a dict with the number of categories and posts written.
+    """
+    counts = {'categories': 0, 'posts': 0}
+
+    with open_archive(path, 'w') as out:
+        out.write(json.dumps({'type': 'header', 'format': ARCHIVE_FORMAT,
+                              'version': ARCHIVE_VERSION,
+                              'exported_at': datetime.utcnow().isoformat()}) + '\n')
+
+        for kind, table, key in (('category', Category.__table__, 'categories'),
+                                 ('post', RedditPost.__table__, 'posts')):
+            result = db.session.execute(
+                select(table).order_by(table.c.id).execution_options(yield_per=chunk_size)
+            )
+            keys = ('type',) + tuple(result.keys())
+            for partition in result.partitions():
+                out.write(''.join(_encoder.encode(dict(zip(keys, (kind,) + tuple(row)))) + '\n'
+                                  for row in partition))
+                counts[key] += len(partition)
+
+    return counts
+
+
+def _read_chunks(path, chunk_size, chunks, errors):
+    """Reader thread: decompress and parse the archive into bounded chunks"""
+    try:
+        with open_archive(path, 'r') as stream:
+            # Decompression and decoding errors surface on the first read
+            try:
+                header = json.loads(stream.readline() or 'null')
+            except Exception as e:
+                raise ArchiveError(f'{path} is not a readable archive: {e}') from e
+            if not isinstance(header, dict) or header.get('format') != ARCHIVE_FORMAT:
+                raise ArchiveError(f'{path} is not a Reddit Post Sorter archive')
+            if header.get('version') != ARCHIVE_VERSION:
+                raise ArchiveError(f'Unsupported archive version: {header.get("version")}')
+
+            kind, batch = None, []
+            for line_number, line in enumerate(stream, start=2):
+                if not line.strip():
+                    continue
+                try:
+                    record = _decode(line)
+                except ValueError as e:
+                    raise ArchiveError(f'{path} line {line_number} is malformed: {e}') from e
+                if record['type'] != kind or len(batch) >= chunk_size:
+                    if batch:
+                        chunks.put((kind, batch))
+                    kind, batch = record['type'], []
+                batch.append(record)
+            if batch:
+                chunks.put((kind, batch))
+    except Exception as e:
+        errors.append(e)
+    finally:
+        chunks.put(None)
+
+
+def import_archive(path, chunk_size=CHUNK_SIZE):
+    """Load an archive at ``path`` into the database
+
+    Decompression and JSON parsing run on a reader thread while this thread
+    bulk-inserts each chunk in its own transaction. Categories are matched by
+    name; posts whose ``reddit_id`` already exists are left untouched.
+    Returns a dict with the number of categories and posts inserted.
+    """
+    counts = {'categories': 0, 'posts': 0}
+    chunks = queue.Queue(maxsize=READ_AHEAD_CHUNKS)
+    errors = []
+
+    reader = threading.Thread(target=_read_chunks, args=(path, chunk_size, chunks, errors), daemon=True)
+    reader.start()
+
+    category_table = Category.__table__
+    post_table = RedditPost.__table__
+    post_columns = [column.name for column in post_table.columns if column.name != 'id']
+
+    # Archived category id -> id in this database
+    category_ids = {}
+
+    with db.engine.connect() as conn:
+        # Pooled connections outlive the import, so put back whatever setting was in force
+        synchronous = None
+        if conn.dialect.name == 'sqlite':
+            synchronous = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+            conn.exec_driver_sql('PRAGMA synchronous = OFF')
+        existing_categories = dict(conn.execute(select(category_table.c.name, category_table.c.id)).all())
+        conn.commit()
+
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                kind, batch = item
+
+                with conn.begin():
+                    if kind == 'category':
+                        for record in batch:
+                            if record['name'] not in existing_categories:
+                                result = conn.execute(insert(category_table).values(
+                                    name=record['name'], color=record.get('color'),
+                                    created_at=record.get('created_at')))
+                                existing_categories[record['name']] = result.inserted_primary_key[0]
+                                counts['categories'] += 1
+                            category_ids[record['id']] = existing_categories[record['name']]
+
+                    elif kind == 'post':
+                        rows = []
+                        for record in batch:
+                            row = {column: record.get(column) for column in post_columns}
+                            row['category_id'] = category_ids.get(record.get('category_id'))
+                            rows.append(row)
+                        result = conn.execute(insert(post_table).prefix_with('OR IGNORE', dialect='sqlite'), rows)
+                        counts['posts'] += max(result.rowcount, 0)
+        finally:
+            if synchronous is not None:
+                conn.exec_driver_sql(f'PRAGMA synchronous = {int(synchronous)}')
+            # Drain the queue so the reader thread can exit if we bailed out early
+            while reader.is_alive():
+                try:
+                    chunks.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            reader.join()
+
+    if errors:
+        raise errors[0]
+
+    return counts
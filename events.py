@@ -0,0 +1,76 @@
+"""
+Live update broadcasting for Reddit Post Sorter
+
+A small in-process publish/subscribe hub. Each open page holds a
+Server-Sent Events connection to ``/events``; routes publish events such as
+``post_added``, ``post_updated`` and ``category_changed`` and every
+subscriber receives a copy. Subscribers live in the memory of the serving
+process, so all pages must be served by the same process (the default for
+``python app.py`` and ``flask run``).
+"""
+import json
+import queue
+import threading
+
+# Events buffered per subscriber before new ones are dropped for that client
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_INTERVAL = 15
+
+
+def sse_message(payload):
+    """Format a payload as a Server-Sent Events data frame"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+class EventBroker:
+    """Fan out published events to every subscribed stream"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Register a new subscriber and return its event queue"""
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def has_subscribers(self):
+        """Whether any page is listening, so callers can skip building events"""
+        with self._lock:
+            return bool(self._subscribers)
+
+    def publish(self, event_type, **data):
+        """Send an event to all subscribers, skipping any that are backed up"""
+        payload = {'type': event_type, **data}
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(payload)
+            except queue.Full:
+                pass
+
+    def stream(self, subscriber):
+        """Yield SSE frames for a subscriber until the client disconnects"""
+        try:
+            yield sse_message({'type': 'connected'})
+            while True:
+                try:
+                    payload = subscriber.get(timeout=KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                yield sse_message(payload)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broker = EventBroker()
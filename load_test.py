@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Load-test harness for Reddit Post Sorter
+
+Measures how the read endpoints behave while a sync is writing to SQLite.
+The harness starts the app in a child process wired to a fake Reddit source,
+ingests N synthetic posts through /fetch_saved_posts_stream and, for the
+duration of the ingest, drives concurrent read traffic against /, /posts and
+/api/posts. It reports p50/p95/p99 latency and error rates per endpoint plus
+ingest throughput, and can save the report as JSON to compare runs.
+
+Examples:
+    python load_test.py --posts 500 --readers 8
+    python load_test.py --seed-posts 2000 --json before.json
+    python load_test.py --seed-posts 2000 --compare before.json
+"""
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from tests.fakes import FakeReddit, make_submission
+
+ENDPOINTS = ['/', '/posts', '/api/posts']
+
+
+# ============================================
+# APP PROCESS
+# ============================================
+def seed_database(count, seed):
+    """Insert ``count`` pre-existing posts so reads have realistic work to do"""
+    from sqlalchemy import insert
+    from app import db, RedditPost
+
+    rng = random.Random(seed + 1)
+    rows = []
+    for index in range(count):
+        submission = make_submission(rng, f'seed{index:06d}')
+        rows.append({
+            'reddit_id': submission.id,
+            'title': submission.title,
+            'author': submission.author,
+            'subreddit': submission.subreddit.display_name,
+            'url': submission.url,
+            'selftext': submission.selftext,
+            'score': submission.score,
+            'num_comments': submission.num_comments,
+            'created_utc': datetime.fromtimestamp(submission.created_utc),
+            'saved_at': datetime.utcnow() - timedelta(days=1, seconds=index),
+            'permalink': f'https://reddit.com{submission.permalink}',
+            'is_self': submission.is_self,
+        })
+    if rows:
+        db.session.execute(insert(RedditPost.__table__), rows)
+        db.session.commit()
+
+
+def serve(args):
+    """Child process: run the app against a fake Reddit source and print its port"""
+    from werkzeug.serving import make_server
+    from app import create_app, db
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{args.db}',
+        'REDDIT_CLIENT_FACTORY': lambda: FakeReddit(args.posts, args.seed),
+        'SYNC_FETCH_LIMIT': args.posts,
+        'SYNC_PROGRESS_DELAY': args.ingest_delay,
+        'TEMPLATE_CACHE_DIR': None,
+    })
+    with app.app_context():
+        db.create_all()
+        seed_database(args.seed_posts, args.seed)
+
+    # Per-request access logs would drown out the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    print(server.server_port, flush=True)
+    server.serve_forever()
+
+
+def start_app(args, db_path):
+    """Start the app process and return (process, port)"""
+    cmd = [sys.executable, os.path.abspath(__file__), '--serve', '--db', db_path,
+           '--posts', str(args.posts), '--seed-posts', str(args.seed_posts),
+           '--seed', str(args.seed), '--ingest-delay', str(args.ingest_delay)]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    port = process.stdout.readline().strip()
+    if not port:
+        process.wait()
+        raise RuntimeError('App process exited before it started listening')
+    return process, int(port)
+
+
+# ============================================
+# TRAFFIC
+# ============================================
+def run_ingest(port, result, done, timeout):
+    """Consume the sync stream, recording throughput until it completes"""
+    started = time.perf_counter()
+    first_post = None
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+        conn.request('GET', '/fetch_saved_posts_stream')
+        response = conn.getresponse()
+        for raw in response:
+            line = raw.decode('utf-8').strip()
+            if not line.startswith('data: '):
+                continue
+            event = json.loads(line[len('data: '):])
+            if event['type'] == 'post_added':
+                result['posts'] += 1
+                # Throughput is measured between the first and last post, past the connection banter
+                now = time.perf_counter()
+                first_post = first_post or now
+                result['ingest_seconds'] = now - first_post
+            elif event['type'] == 'warning':
+                result['warnings'] += 1
+            elif event['type'] in ('complete', 'error'):
+                if event['type'] == 'error':
+                    result['errors'] += 1
+                break
+        conn.close()
+    except Exception:
+        result['errors'] += 1
+    finally:
+        result['seconds'] = time.perf_counter() - started
+        done.set()
+
+
+def run_reader(port, offset, samples, done, timeout, think_time):
+    """Issue reads in a loop until the ingest finishes"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+    index = offset
+    while not done.is_set():
+        endpoint = ENDPOINTS[index % len(ENDPOINTS)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            conn.request('GET', endpoint)
+            response = conn.getresponse()
+            response.read()
+            ok = response.status < 400
+        except Exception:
+            ok = False
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+        samples.append((endpoint, time.perf_counter() - started, ok))
+        if think_time:
+            time.sleep(think_time)
+    conn.close()
+
+
+# ============================================
+# REPORTING
+# ============================================
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def build_report(args, ingest, samples, elapsed):
+    endpoints = {}
+    for endpoint in ENDPOINTS:
+        latencies = [seconds * 1000 for name, seconds, ok in samples if name == endpoint]
+        errors = sum(1 for name, _, ok in samples if name == endpoint and not ok)
+        endpoints[endpoint] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': errors / len(latencies) if latencies else 0.0,
+            'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+            'p50_ms': percentile(latencies, 50),
+            'p95_ms': percentile(latencies, 95),
+            'p99_ms': percentile(latencies, 99),
+            'max_ms': max(latencies) if latencies else None,
+        }
+
+    return {
+        'config': {
+            'posts': args.posts,
+            'seed_posts': args.seed_posts,
+            'readers': args.readers,
+            'ingest_delay': args.ingest_delay,
+            'think_time': args.think_time,
+        },
+        'ingest': dict(ingest, posts_per_second=(ingest['posts'] - 1) / ingest['ingest_seconds']
+                       if ingest['ingest_seconds'] else 0.0),
+        'endpoints': endpoints,
+    }
+
+
+def format_ms(value):
+    return '-' if value is None else f'{value:.1f}'
+
+
+def print_report(report, baseline=None):
+    ingest = report['ingest']
+    print(f"\nIngest: {ingest['posts']} posts, sync took {ingest['seconds']:.2f}s "
+          f"({ingest['posts_per_second']:.1f} posts/s), "
+          f"{ingest['warnings']} warnings, {ingest['errors']} errors")
+
+    print(f"\n{'Endpoint':<12} {'Requests':>9} {'Req/s':>8} {'Errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    print('-' * 76)
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:<12} {stats['requests']:>9} {stats['requests_per_second']:>8.1f} "
+              f"{stats['error_rate']:>6.1%} {format_ms(stats['p50_ms']):>8} {format_ms(stats['p95_ms']):>8} "
+              f"{format_ms(stats['p99_ms']):>8} {format_ms(stats['max_ms']):>8}")
+
+    if baseline:
+        print('\nChange vs baseline (p95 / p99 latency, ingest throughput):')
+        for endpoint, stats in report['endpoints'].items():
+            before = baseline['endpoints'].get(endpoint)
+            if before and before['p95_ms'] and stats['p95_ms']:
+                print(f"  {endpoint:<12} p95 {stats['p95_ms'] / before['p95_ms'] - 1:+.1%}  "
+                      f"p99 {stats['p99_ms'] / before['p99_ms'] - 1:+.1%}")
+        if baseline['ingest']['posts_per_second']:
+            change = ingest['posts_per_second'] / baseline['ingest']['posts_per_second'] - 1
+            print(f"  {'ingest':<12} {change:+.1%}")
+
+
+def run(args):
+    """Run one load test and return the report"""
+    workdir = tempfile.mkdtemp(prefix='reddit_sorter_load_')
+    process, port = start_app(args, os.path.join(workdir, 'loadtest.db'))
+    try:
+        done = threading.Event()
+        ingest = {'posts': 0, 'warnings': 0, 'errors': 0, 'seconds': 0.0, 'ingest_seconds': 0.0}
+        samples = []
+
+        readers = [threading.Thread(target=run_reader, args=(port, i, samples, done, args.timeout, args.think_time),
+                                    daemon=True)
+                   for i in range(args.readers)]
+        for reader in readers:
+            reader.start()
+
+        started = time.perf_counter()
+        ingest_thread = threading.Thread(target=run_ingest, args=(port, ingest, done, args.timeout), daemon=True)
+        ingest_thread.start()
+        if not done.wait(args.timeout):
+            ingest['errors'] += 1
+            done.set()
+        elapsed = time.perf_counter() - started
+
+        for reader in readers:
+            reader.join(args.timeout)
+
+        return build_report(args, ingest, samples, elapsed)
+    finally:
+        process.terminate()
+        process.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test Reddit Post Sorter reads during an active sync")
+
+    parser.add_argument("-n", "--posts", type=int, default=200,
+                       help="Synthetic posts to ingest through the sync stream (default: 200)")
+    parser.add_argument("-c", "--readers", type=int, default=4,
+                       help="Concurrent reader connections (default: 4)")
+    parser.add_argument("--seed-posts", type=int, default=500,
+                       help="Posts already in the database before the sync starts (default: 500)")
+    parser.add_argument("--ingest-delay", type=float, default=0.0,
+                       help="Seconds the sync waits between posts (default: 0, the app uses 0.1)")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                       help="Seconds each reader waits between requests (default: 0)")
+    parser.add_argument("--seed", type=int, default=0,
+                       help="Random seed for synthetic data")
+    parser.add_argument("--timeout", type=float, default=300.0,
+                       help="Give up after this many seconds (default: 300)")
+    parser.add_argument("--json", type=str,
+                       help="Write the report to this JSON file")
+    parser.add_argument("--compare", type=str,
+                       help="Compare against a report previously saved with --json")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--db", type=str, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args)
+        return
+
+    print(f"Ingesting {args.posts} posts over {args.seed_posts} existing ones with {args.readers} concurrent readers...")
+    report = run(args)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to {args.json}")
+
+    sys.exit(1 if report['ingest']['errors'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Serialized post payload cache for Reddit Post Sorter
+
+Saved posts never change after ingest except for their category, so the JSON
+for a post can be encoded once and reused by every ``/api/posts`` response.
+Entries are keyed by the post's identity plus the state of its category (see
+``post_payload_key`` in app.py); when a post is reassigned or its category is
+renamed or recoloured the key changes, the stale entry is simply never hit
+again and ages out of the LRU.
+"""
+import threading
+from collections import OrderedDict
+
+# Encoded posts kept in memory per process (roughly 0.5-1 KB each)
+POST_PAYLOAD_CACHE_SIZE = 20000
+
+
+class PayloadCache:
+    """Thread-safe LRU mapping cache keys to encoded JSON bytes"""
+
+    def __init__(self, maxsize=POST_PAYLOAD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is not None:
+                self._entries.move_to_end(key)
+            return payload
+
+    def put(self, key, payload):
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+post_payloads = PayloadCache()
@@ -14,7 +14,7 @@ import time
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from app import app, db
+from app import create_app, db, Category, RedditPost
 
 
 def pytest_addoption(parser):
@@ -28,20 +28,30 @@ def pytest_addoption(parser):
 
 @pytest.fixture(scope="session")
 def test_app():
-    """Create and configure a test Flask app"""
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///test_reddit_sorter.db'
-    app.config['WTF_CSRF_ENABLED'] = False
+    """Create and configure a test Flask app backed by an in-memory database"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite://',
+        'WTF_CSRF_ENABLED': False,
+        'TEMPLATE_CACHE_DIR': None,
+    })
     
     with app.app_context():
         db.create_all()
         yield app
         db.session.remove()
-        db.drop_all()
-        
-        # Clean up test database
-        if os.path.exists('test_reddit_sorter.db'):
-            os.remove('test_reddit_sorter.db')
+
+@pytest.fixture(scope="function")
+def clean_db(test_app):
+    """Empty the posts and categories tables before and after a test"""
+    RedditPost.query.delete()
+    Category.query.delete()
+    db.session.commit()
+    yield
+    db.session.rollback()
+    RedditPost.query.delete()
+    Category.query.delete()
+    db.session.commit()
 
 @pytest.fixture(scope="session")
 def flask_server(test_app):
@@ -0,0 +1,59 @@
+"""
+Fake Reddit source shared by the tests and the load-test harness
+
+Stands in for PRAW via the ``REDDIT_CLIENT_FACTORY`` config: produces
+deterministic synthetic saved posts with the attributes the sync reads,
+without network access or credentials.
+"""
+import random
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+SUBREDDITS = ['python', 'flask', 'sqlite', 'programming', 'learnpython', 'webdev', 'dataisbeautiful', 'askscience']
+WORDS = ('lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor '
+         'incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud').split()
+
+
+def make_submission(rng, reddit_id):
+    """Build a synthetic submission with the attributes the sync reads from PRAW"""
+    is_self = rng.random() < 0.4
+    subreddit = rng.choice(SUBREDDITS)
+    submission = SimpleNamespace(
+        id=reddit_id,
+        title=' '.join(rng.choices(WORDS, k=rng.randint(4, 14))).capitalize(),
+        author=f'user{rng.randint(1, 5000)}',
+        subreddit=SimpleNamespace(display_name=subreddit),
+        url=f'https://example.com/{reddit_id}',
+        selftext=' '.join(rng.choices(WORDS, k=rng.randint(20, 120))) if is_self else '',
+        score=rng.randint(0, 50000),
+        num_comments=rng.randint(0, 3000),
+        created_utc=(datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 500000))).timestamp(),
+        permalink=f'/r/{subreddit}/comments/{reddit_id}/',
+        is_self=is_self,
+        thumbnail='self' if is_self else f'https://example.com/thumbs/{reddit_id}.jpg',
+    )
+    if not is_self:
+        submission.preview = {'images': [{'source': {'url': f'https://example.com/previews/{reddit_id}.jpg'}}]}
+    return submission
+
+
+class FakeRedditor:
+    """Stands in for praw's Redditor: yields a fixed number of saved posts"""
+
+    def __init__(self, count, seed=0):
+        self.name = 'loadtest'
+        self.count = count
+        self.seed = seed
+
+    def saved(self, limit=None):
+        rng = random.Random(self.seed)
+        total = self.count if limit is None else min(self.count, limit)
+        for index in range(total):
+            yield make_submission(rng, f'lt{index:06d}')
+
+
+class FakeReddit:
+    """Stands in for praw.Reddit with no network access"""
+
+    def __init__(self, count, seed=0):
+        self.user = SimpleNamespace(me=lambda: FakeRedditor(count, seed))
@@ -0,0 +1,122 @@
+"""
+Tests for archive export/import
+"""
+import json
+import pytest
+from datetime import datetime
+
+from app import db, Category, RedditPost
+from archive import ARCHIVE_FORMAT, ARCHIVE_VERSION, ArchiveError, export_archive, import_archive, open_archive
+
+
+def add_sample_data():
+    news = Category(name='News', color='#ff0000')
+    db.session.add(news)
+    db.session.flush()
+    for i in range(25):
+        db.session.add(RedditPost(
+            reddit_id=f'abc{i}',
+            title=f'Post number {i} – ünïcode',
+            author='someone',
+            subreddit='python',
+            score=i,
+            created_utc=datetime(2024, 1, 1, 12, i),
+            category_id=news.id if i % 2 else None,
+        ))
+    db.session.commit()
+
+
+@pytest.mark.integration
+class TestArchive:
+    """Test archive round trips"""
+
+    @pytest.mark.parametrize("extension", ["ndjson.zst", "ndjson.gz", "ndjson"])
+    def test_round_trip(self, clean_db, tmp_path, extension):
+        """Test that an exported archive restores posts, categories and assignments"""
+        add_sample_data()
+        path = str(tmp_path / f"archive.{extension}")
+
+        assert export_archive(path, chunk_size=10) == {'categories': 1, 'posts': 25}
+
+        RedditPost.query.delete()
+        Category.query.delete()
+        db.session.commit()
+
+        assert import_archive(path, chunk_size=10) == {'categories': 1, 'posts': 25}
+
+        news = Category.query.filter_by(name='News').one()
+        assert news.color == '#ff0000'
+        assert RedditPost.query.filter_by(category_id=news.id).count() == 12
+
+        post = RedditPost.query.filter_by(reddit_id='abc3').one()
+        assert post.title == 'Post number 3 – ünïcode'
+        assert post.created_utc == datetime(2024, 1, 1, 12, 3)
+        assert post.category_id == news.id
+
+    def test_import_merges_into_existing_data(self, clean_db, tmp_path):
+        """Test that existing posts are skipped and categories are matched by name"""
+        add_sample_data()
+        path = str(tmp_path / "archive.ndjson.zst")
+        export_archive(path)
+
+        RedditPost.query.filter(RedditPost.reddit_id.in_(['abc1', 'abc2'])).delete()
+        db.session.commit()
+
+        assert import_archive(path) == {'categories': 0, 'posts': 2}
+        assert RedditPost.query.count() == 25
+        assert Category.query.count() == 1
+
+    def test_import_restores_synchronous_setting(self, clean_db, tmp_path):
+        """Test that import puts back the connection's previous PRAGMA synchronous"""
+        add_sample_data()
+        path = str(tmp_path / "archive.ndjson")
+        export_archive(path)
+
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql('PRAGMA synchronous = NORMAL')
+        import_archive(path)
+
+        with db.engine.connect() as conn:
+            assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 1
+
+    def test_rejects_foreign_file(self, clean_db, tmp_path):
+        """Test that files without an archive header are refused"""
+        path = str(tmp_path / "not_an_archive.ndjson.gz")
+        with open_archive(path, 'w') as out:
+            out.write(json.dumps({'type': 'post', 'reddit_id': 'x'}) + '\n')
+
+        with pytest.raises(ArchiveError):
+            import_archive(path)
+        assert RedditPost.query.count() == 0
+
+    @pytest.mark.parametrize("header", ["not json at all", "[1, 2, 3]"])
+    def test_rejects_malformed_header(self, clean_db, tmp_path, header):
+        """Test that unparseable or non-object headers raise ArchiveError"""
+        path = tmp_path / "broken.ndjson"
+        path.write_text(header + '\n')
+
+        with pytest.raises(ArchiveError):
+            import_archive(str(path))
+
+    @pytest.mark.parametrize("record", [
+        {'reddit_id': 'x'},
+        {'type': 'category', 'id': 1},
+        {'type': 'post', 'reddit_id': 'x', 'created_utc': 5},
+        ['not', 'a', 'record'],
+    ])
+    def test_rejects_malformed_record(self, clean_db, tmp_path, record):
+        """Test that records the importer cannot use raise ArchiveError with their line number"""
+        path = tmp_path / "broken.ndjson"
+        path.write_text(json.dumps({'type': 'header', 'format': ARCHIVE_FORMAT, 'version': ARCHIVE_VERSION}) + '\n'
+                        + json.dumps(record) + '\n')
+
+        with pytest.raises(ArchiveError, match='line 2'):
+            import_archive(str(path))
+        assert RedditPost.query.count() == 0
+
+    def test_cli_reports_archive_errors(self, clean_db, test_app, tmp_path):
+        """Test that the CLI prints a short error instead of a traceback"""
+        result = test_app.test_cli_runner().invoke(args=['import-archive', str(tmp_path / 'missing.ndjson')])
+
+        assert result.exit_code == 1
+        assert 'Error: Cannot open' in result.output
@@ -0,0 +1,177 @@
+"""
+Tests for live update events and JSON fragment responses
+"""
+import pytest
+from sqlalchemy import event
+
+from app import db, Category, RedditPost
+from events import EventBroker, broker, sse_message
+from payload_cache import post_payloads
+from tests.fakes import FakeReddit
+
+
+@pytest.fixture(scope="function")
+def client(test_app, clean_db):
+    """Flask test client over empty tables"""
+    return test_app.test_client()
+
+
+@pytest.fixture(scope="function")
+def subscriber():
+    """Subscribe to the app's broker for the duration of a test"""
+    queue = broker.subscribe()
+    yield queue
+    broker.unsubscribe(queue)
+
+
+def drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+JSON = {'Accept': 'application/json'}
+
+
+@pytest.fixture(scope="function")
+def fake_reddit(test_app, monkeypatch):
+    """Sync five fake saved posts without the progress delay"""
+    monkeypatch.setitem(test_app.config, 'REDDIT_CLIENT_FACTORY', lambda: FakeReddit(5))
+    monkeypatch.setitem(test_app.config, 'SYNC_PROGRESS_DELAY', 0)
+
+
+class TestEventBroker:
+    """Test the publish/subscribe hub"""
+
+    def test_publish_reaches_every_subscriber(self):
+        """Test that each subscriber gets its own copy of an event"""
+        hub = EventBroker()
+        first, second = hub.subscribe(), hub.subscribe()
+
+        hub.publish('post_added', post={'id': 1})
+
+        assert first.get_nowait() == {'type': 'post_added', 'post': {'id': 1}}
+        assert second.get_nowait() == {'type': 'post_added', 'post': {'id': 1}}
+
+    def test_stream_unsubscribes_on_disconnect(self):
+        """Test that closing a stream removes its subscriber"""
+        hub = EventBroker()
+        subscriber = hub.subscribe()
+        stream = hub.stream(subscriber)
+        hub.publish('post_updated', post={'id': 2})
+
+        assert next(stream) == sse_message({'type': 'connected'})
+        assert next(stream) == sse_message({'type': 'post_updated', 'post': {'id': 2}})
+
+        stream.close()
+        hub.publish('post_updated', post={'id': 3})
+        assert subscriber.empty()
+
+
+class TestJsonFragments:
+    """Test JSON variants of the category and assignment routes"""
+
+    def test_assign_category_returns_badge(self, client, subscriber):
+        """Test that assigning a category returns only the badge and broadcasts it"""
+        category = Category(name='Music', color='#123456')
+        post = RedditPost(reddit_id='xyz', title='A song')
+        db.session.add_all([category, post])
+        db.session.commit()
+
+        response = client.post(f'/assign_category/{post.id}', data={'category_id': category.id}, headers=JSON)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['post']['category_name'] == 'Music'
+        assert 'category-badge' in data['html']
+        assert 'post-card' not in data['html']
+        assert drain(subscriber) == [dict(data, type='post_updated')]
+
+    def test_assign_invalid_category_is_json_error(self, client):
+        """Test that an unknown category is reported as a JSON error"""
+        post = RedditPost(reddit_id='xyz', title='A song')
+        db.session.add(post)
+        db.session.commit()
+
+        response = client.post(f'/assign_category/{post.id}', data={'category_id': 999}, headers=JSON)
+
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+    def test_category_lifecycle_broadcasts_changes(self, client, subscriber):
+        """Test that create, update and delete publish category_changed events"""
+        response = client.post('/create_category', data={'name': 'News', 'color': '#ff0000'}, headers=JSON)
+        assert response.status_code == 201
+        category_id = response.get_json()['category']['id']
+        assert f'id="category-{category_id}"' in response.get_json()['html']
+
+        response = client.post(f'/update_category/{category_id}', data={'name': 'World News', 'color': '#00ff00'}, headers=JSON)
+        assert response.get_json()['category']['name'] == 'World News'
+
+        response = client.get(f'/delete_category/{category_id}', headers=JSON)
+        assert response.get_json()['category']['id'] == category_id
+
+        events = drain(subscriber)
+        assert [event['action'] for event in events] == ['created', 'updated', 'deleted']
+        assert all(event['type'] == 'category_changed' for event in events)
+
+    def test_duplicate_category_is_json_error(self, client):
+        """Test that validation errors come back as JSON instead of a redirect"""
+        client.post('/create_category', data={'name': 'News'}, headers=JSON)
+        response = client.post('/create_category', data={'name': 'News'}, headers=JSON)
+
+        assert response.status_code == 400
+        assert 'already exists' in response.get_json()['error']
+
+    def test_rename_to_existing_category_is_json_error(self, client):
+        """Test that renaming onto another category's name is a 400, not a 500"""
+        client.post('/create_category', data={'name': 'News'}, headers=JSON)
+        response = client.post('/create_category', data={'name': 'Music'}, headers=JSON)
+        music_id = response.get_json()['category']['id']
+
+        response = client.post(f'/update_category/{music_id}', data={'name': 'News'}, headers=JSON)
+
+        assert response.status_code == 400
+        assert 'already exists' in response.get_json()['error']
+        assert db.session.get(Category, music_id).name == 'Music'
+
+    def test_html_clients_still_redirect(self, client):
+        """Test that regular form posts keep the redirect behaviour"""
+        response = client.post('/create_category', data={'name': 'News'})
+
+        assert response.status_code == 302
+
+
+class TestSyncBroadcast:
+    """Test what the saved-post sync publishes to open pages"""
+
+    def test_sync_publishes_cards_without_reloading_categories(self, client, subscriber, fake_reddit):
+        """Test that each new post is broadcast and categories are queried only once"""
+        db.session.add_all([Category(name='Music', color='#123456'), Category(name='News', color='#ff0000')])
+        db.session.commit()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            client.get('/fetch_saved_posts_stream').get_data()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+
+        events = [e for e in drain(subscriber) if e['type'] == 'post_added']
+        assert len(events) == 5
+        assert all('News' in e['html']['compact'] and 'News' in e['html']['detailed'] for e in events)
+        assert len([s for s in statements if 'FROM category' in s]) == 1
+
+    def test_sync_caches_payloads_without_subscribers(self, client, fake_reddit, monkeypatch):
+        """Test that payloads are cached but cards are not rendered when no page is listening"""
+        post_payloads.clear()
+        monkeypatch.setattr('app.render_post_cards', lambda *args: pytest.fail('rendered without subscribers'))
+
+        client.get('/fetch_saved_posts_stream').get_data()
+
+        assert RedditPost.query.count() == 5
+        assert len(post_payloads) == 5
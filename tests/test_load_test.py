@@ -0,0 +1,54 @@
+"""
+Tests for the load-test harness and its fake Reddit source
+"""
+import argparse
+import pytest
+
+from app import RedditPost
+from load_test import ENDPOINTS, percentile, run
+from tests.fakes import FakeReddit
+
+
+@pytest.fixture(scope="function")
+def fake_sync_app(test_app, clean_db, monkeypatch):
+    """Point the test app's sync at a fake Reddit source over empty tables"""
+    # monkeypatch puts back whatever the session app was configured with
+    monkeypatch.setitem(test_app.config, 'REDDIT_CLIENT_FACTORY', lambda: FakeReddit(7))
+    monkeypatch.setitem(test_app.config, 'SYNC_PROGRESS_DELAY', 0)
+    return test_app
+
+
+class TestLoadTestHarness:
+    """Test the pieces the load-test harness is built from"""
+
+    def test_percentile_nearest_rank(self):
+        """Test percentile picks the nearest-rank sample"""
+        values = list(range(1, 101))
+
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) is None
+
+    def test_sync_uses_fake_reddit_source(self, fake_sync_app):
+        """Test that the sync stream ingests posts from REDDIT_CLIENT_FACTORY"""
+        body = fake_sync_app.test_client().get('/fetch_saved_posts_stream').get_data(as_text=True)
+
+        assert body.count('"type": "post_added"') == 7
+        assert RedditPost.query.count() == 7
+
+    @pytest.mark.slow
+    @pytest.mark.integration
+    def test_run_reports_latency_and_throughput(self):
+        """Test a small end-to-end run against a real app process"""
+        args = argparse.Namespace(posts=5, readers=2, seed_posts=10, ingest_delay=0.05,
+                                  think_time=0.0, seed=0, timeout=60.0)
+
+        report = run(args)
+
+        assert report['ingest']['posts'] == 5
+        assert report['ingest']['errors'] == 0
+        assert set(report['endpoints']) == set(ENDPOINTS)
+        for stats in report['endpoints'].values():
+            assert stats['requests'] > 0
+            assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
@@ -0,0 +1,87 @@
+"""
+Tests for the serialized post payload cache behind /api/posts
+"""
+import pytest
+
+from app import db, serialize_post, Category, RedditPost
+from payload_cache import PayloadCache, post_payloads
+
+
+@pytest.fixture(scope="function")
+def client(test_app, clean_db):
+    """Flask test client over empty tables and an empty payload cache"""
+    post_payloads.clear()
+    yield test_app.test_client()
+    post_payloads.clear()
+
+
+def add_posts(count, category=None):
+    posts = [RedditPost(reddit_id=f'p{i}', title=f'Post {i}', category=category) for i in range(count)]
+    db.session.add_all(posts)
+    db.session.commit()
+    return posts
+
+
+class TestPayloadCache:
+    """Test the LRU itself"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest untouched entry is dropped when full"""
+        cache = PayloadCache(maxsize=2)
+        cache.put('a', b'1')
+        cache.put('b', b'2')
+        cache.get('a')
+        cache.put('c', b'3')
+
+        assert cache.get('a') == b'1'
+        assert cache.get('b') is None
+        assert len(cache) == 2
+
+
+class TestApiPostsCache:
+    """Test that cached payloads stay in step with the database"""
+
+    def test_response_matches_serialized_posts(self, client):
+        """Test that cached responses are identical to freshly serialized posts"""
+        news = Category(name='News', color='#ff0000')
+        add_posts(3, category=news)
+
+        first = client.get('/api/posts').get_json()
+        second = client.get('/api/posts').get_json()
+
+        expected = [serialize_post(post) for post in RedditPost.query.order_by(RedditPost.saved_at.desc())]
+        assert first == second == expected
+        assert len(post_payloads) == 3
+
+    def test_assignment_is_reflected(self, client):
+        """Test that reassigning a post changes its cached payload"""
+        news = Category(name='News', color='#ff0000')
+        db.session.add(news)
+        post, = add_posts(1)
+        client.get('/api/posts')
+
+        client.post(f'/assign_category/{post.id}', data={'category_id': news.id})
+
+        assert client.get('/api/posts').get_json()[0]['category_name'] == 'News'
+
+    def test_category_edit_is_reflected(self, client):
+        """Test that renaming or recolouring a category invalidates its posts"""
+        news = Category(name='News', color='#ff0000')
+        add_posts(2, category=news)
+        client.get('/api/posts')
+
+        client.post(f'/update_category/{news.id}', data={'name': 'World News', 'color': '#00ff00'})
+
+        posts = client.get('/api/posts').get_json()
+        assert {(post['category_name'], post['category_color']) for post in posts} == {('World News', '#00ff00')}
+
+    def test_listing_larger_than_cache_bypasses_it(self, client, monkeypatch):
+        """Test that oversized listings are served without filling the cache"""
+        monkeypatch.setattr(post_payloads, 'maxsize', 2)
+        add_posts(3)
+
+        posts = client.get('/api/posts').get_json()
+
+        expected = [serialize_post(post) for post in RedditPost.query.order_by(RedditPost.saved_at.desc())]
+        assert posts == expected
+        assert len(post_payloads) == 0